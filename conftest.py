@@ -0,0 +1,39 @@
+"""Shared pytest fixtures for the modbus_tcp_proxy tests"""
+import copy
+import logging
+import time
+
+import pytest
+
+import modbus_tcp_proxy as proxy
+
+# Minimale gültige Konfiguration; Tests erhalten über base_config eine eigene Kopie
+BASE_CONFIG = {
+    "Proxy": {"ServerHost": "127.0.0.1", "ServerPort": 5020},
+    "ModbusServer": {"ModbusServerHost": "127.0.0.1", "ModbusServerPort": 502},
+}
+
+# Log-Ausgaben des Proxys einmal pro Sitzung bzw. xdist-Worker unterdrücken
+@pytest.fixture(scope="session", autouse=True)
+def quiet_logging():
+    logging.disable(logging.CRITICAL)
+    yield
+    logging.disable(logging.NOTSET)
+
+# Wartezeiten aufzeichnen statt zu schlafen, damit kein Backoff die Tests blockiert
+@pytest.fixture(autouse=True)
+def sleeps(monkeypatch):
+    """Durations passed to time.sleep during the test"""
+    calls = []
+    monkeypatch.setattr(time, "sleep", calls.append)
+    return calls
+
+# ModbusConfig ist unveränderlich und kann von allen Tests geteilt werden
+@pytest.fixture(scope="session")
+def modbus_config():
+    return proxy.ModbusConfig(host="127.0.0.1", port=502, timeout=1, delay=0.0)
+
+@pytest.fixture
+def base_config():
+    """Fresh copy of the minimal valid configuration"""
+    return copy.deepcopy(BASE_CONFIG)
@@ -1,23 +1,53 @@
 import argparse
 import os
 import queue
+import collections
 import threading
 import time
 import logging
+import logging.handlers
 import socket
+import selectors
 import ipaddress
 import signal
 import random
+import errno
+import re
+import bisect
+import struct
+import copy
+import functools
+import atexit
 from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from contextlib import contextmanager
-import yaml
-from cerberus import Validator
-from pymodbus.client import ModbusTcpClient
-from ipaddress import ip_address, ip_network
+from ipaddress import ip_address, ip_network, collapse_addresses
+
+# Modbus-Protokollkonstanten
+MODBUS_TCP_HEADER_LENGTH = 6
+MODBUS_MAX_ADU_LENGTH = 260
+DEFAULT_RECV_BUFFER_SIZE = 1024
+CLIENT_SEND_TIMEOUT = 5.0
+MODBUS_READ_REGISTER_FUNCTIONS = (0x03, 0x04)
+MODBUS_MAX_READ_REGISTERS = 125
+MAX_COALESCE_BATCH = 32
+MAX_PIPELINE_DEPTH = 16
+MAX_UPSTREAM_CONNECTIONS = 16
+SOCKET_BUFFER_SIZE = 16 * 1024
+KEEPALIVE_IDLE = 30
+ACCEPT_BACKOFF = 0.1
+# Vorkompilierte Formate: IPv4-Adresse als Ganzzahl sowie MBAP-Kopf + Registerlesezugriff bzw. Kopf + Byteanzahl der Antwort
+_IPV4 = struct.Struct("!I").unpack
+_PDU_LEN = struct.Struct(">H").unpack_from
+_PACK_TRANSACTION_ID = struct.Struct(">H").pack
+_READ_REQUEST = struct.Struct(">HHHBBHH")
+_READ_RESPONSE_HEADER = struct.Struct(">HHHBBB")
+
+# Hintergrund-Thread, der Log-Einträge aus der Queue schreibt
+_log_listener = None
 
 # Datenklassen für Konfigurationen
-@dataclass
+@dataclass(frozen=True)
 class ModbusConfig:
     host: str
     port: int
@@ -25,6 +55,8 @@ class ModbusConfig:
     delay: float
     max_retries: int = 5
     max_backoff: float = 30.0
+    coalesce_window: float = 0.0
+    pipeline_depth: int = 1
 
 @dataclass
 class ProxyConfig:
@@ -33,6 +65,9 @@ class ProxyConfig:
     allowed_ips: list = None
     max_connections: int = 100
 
+# Gültige Hostnamen (RFC 1123), einmalig kompiliert
+_HOSTNAME_RE = re.compile(r"[A-Za-z0-9]([A-Za-z0-9-]{0,61}[A-Za-z0-9])?(\.[A-Za-z0-9]([A-Za-z0-9-]{0,61}[A-Za-z0-9])?)*\.?")
+
 # Validierungsfunktion für Netzwerkeinstellungen
 def validate_network_settings(field, value, error):
     """Custom validator for network settings"""
@@ -41,290 +76,929 @@ def validate_network_settings(field, value, error):
             try:
                 ipaddress.ip_address(value)
             except ValueError:
-                if not all(c.isalnum() or c in ".-" for c in value):
+                if len(value) > 253 or not _HOSTNAME_RE.fullmatch(value):
                     error(field, "Invalid hostname or IP address")
     except Exception as e:
         error(field, f"Validation error: {str(e)}")
 
+# Beschreibung eines Konfigurationswerts
+@dataclass(frozen=True)
+class ConfigField:
+    kind: type
+    required: bool = False
+    default: object = None
+    minimum: float = None
+    maximum: float = None
+    allowed: tuple = None
+    check: object = None
+
+# Konfigurationsschema
+CONFIG_SCHEMA = {
+    "Proxy": {
+        "ServerHost": ConfigField(str, required=True, check=validate_network_settings),
+        "ServerPort": ConfigField(int, required=True, minimum=1, maximum=65535),
+        "AllowedIPs": ConfigField(list, default=[]),
+        "MaxConnections": ConfigField(int, default=100, minimum=1, maximum=10000),
+        "Listeners": ConfigField(int, default=1, minimum=0, maximum=256)
+    },
+    "ModbusServer": {
+        "ModbusServerHost": ConfigField(str, required=True, check=validate_network_settings),
+        "ModbusServerPort": ConfigField(int, required=True, minimum=1, maximum=65535),
+        "ConnectionTimeout": ConfigField(int, default=10, minimum=1),
+        "DelayAfterConnection": ConfigField(float, default=0.5, minimum=0.0),
+        "MaxRetries": ConfigField(int, default=5, minimum=1),
+        "MaxBackoff": ConfigField(float, default=30.0, minimum=1.0),
+        "CoalesceWindow": ConfigField(float, default=0.0, minimum=0.0, maximum=1.0),
+        "PipelineDepth": ConfigField(int, default=1, minimum=1, maximum=MAX_PIPELINE_DEPTH),
+        "UpstreamConnections": ConfigField(int, default=1, minimum=1, maximum=MAX_UPSTREAM_CONNECTIONS)
+    },
+    "Logging": {
+        "Enable": ConfigField(bool, default=False),
+        "LogFile": ConfigField(str),
+        "LogLevel": ConfigField(str, default="INFO", allowed=("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"))
+    }
+}
+REQUIRED_SECTIONS = ("Proxy", "ModbusServer")
+
+# Umgebungsvariablen-Overrides, einmalig aus dem Schema erzeugt
+ENV_PREFIX = "MODBUS_PROXY_"
+
+def env_coercer(kind):
+    """Return the function converting an environment string to a config value"""
+    if kind is bool:
+        return lambda value: value.lower() in ("true", "1", "yes")
+    if kind is list:
+        return lambda value: [item.strip() for item in value.split(",") if item.strip()]
+    return kind
+
+ENV_OVERRIDES = {
+    f"{ENV_PREFIX}{section.upper()}_{key.upper()}": (section, key, env_coercer(spec.kind))
+    for section, fields in CONFIG_SCHEMA.items()
+    for key, spec in fields.items()
+}
+
+# Einzelnen Konfigurationswert prüfen
+def check_config_value(key, value, spec, error):
+    """Type- and range-check a single value, returning it normalized"""
+    if spec.kind is float and isinstance(value, int) and not isinstance(value, bool):
+        value = float(value)
+    if not isinstance(value, spec.kind) or (spec.kind is not bool and isinstance(value, bool)):
+        error(key, f"must be of {spec.kind.__name__} type")
+        return value
+    if spec.kind is list and not all(isinstance(item, str) for item in value):
+        error(key, "must be a list of strings")
+    if spec.minimum is not None and value < spec.minimum:
+        error(key, f"min value is {spec.minimum}")
+    if spec.maximum is not None and value > spec.maximum:
+        error(key, f"max value is {spec.maximum}")
+    if spec.allowed is not None and value not in spec.allowed:
+        error(key, f"unallowed value {value}")
+    if spec.check is not None:
+        spec.check(key, value, error)
+    return value
+
 # Konfigurationsvalidierung
 def validate_config(config):
     """Validate and normalize configuration with enhanced validation"""
-    schema = {
-        'Proxy': {
-            'type': 'dict',
-            'schema': {
-                'ServerHost': {
-                    'type': 'string',
-                    'required': True,
-                    'check_with': validate_network_settings
-                },
-                'ServerPort': {
-                    'type': 'integer',
-                    'min': 1,
-                    'max': 65535,
-                    'required': True
-                },
-                'AllowedIPs': {
-                    'type': 'list',
-                    'schema': {'type': 'string'},
-                    'default': []
-                },
-                'MaxConnections': {
-                    'type': 'integer',
-                    'min': 1,
-                    'max': 10000,
-                    'default': 100
-                }
-            }
-        },
-        'ModbusServer': {
-            'type': 'dict',
-            'schema': {
-                'ModbusServerHost': {
-                    'type': 'string',
-                    'required': True,
-                    'check_with': validate_network_settings
-                },
-                'ModbusServerPort': {
-                    'type': 'integer',
-                    'min': 1,
-                    'max': 65535,
-                    'required': True
-                },
-                'ConnectionTimeout': {
-                    'type': 'integer',
-                    'min': 1,
-                    'default': 10
-                },
-                'DelayAfterConnection': {
-                    'type': 'float',
-                    'min': 0.0,
-                    'default': 0.5
-                },
-                'MaxRetries': {
-                    'type': 'integer',
-                    'min': 1,
-                    'default': 5
-                },
-                'MaxBackoff': {
-                    'type': 'float',
-                    'min': 1.0,
-                    'default': 30.0
-                }
-            }
-        },
-        'Logging': {
-            'type': 'dict',
-            'schema': {
-                'Enable': {'type': 'boolean', 'default': False},
-                'LogFile': {'type': 'string', 'required': False},
-                'LogLevel': {
-                    'type': 'string',
-                    'allowed': ['DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL'],
-                    'default': 'INFO'
-                }
-            }
-        }
-    }
+    errors = {}
+    if not isinstance(config, dict):
+        raise ValueError("Configuration validation failed: configuration must be a mapping")
 
-    validator = Validator(schema)
-    if not validator.validate(config):
-        raise ValueError(f"Configuration validation failed: {validator.errors}")
-    
-    # Umgebungsvariablen überschreiben Konfigurationswerte, falls vorhanden
+    normalized = {}
+    for section, fields in CONFIG_SCHEMA.items():
+        values = config.get(section)
+        if values is None:
+            if section in REQUIRED_SECTIONS:
+                errors[section] = ["required field"]
+                continue
+            values = {}
+        if not isinstance(values, dict):
+            errors[section] = ["must be of dict type"]
+            continue
+        section_errors = {}
+        for key in values:
+            if key not in fields:
+                section_errors.setdefault(key, []).append("unknown field")
+        normalized[section] = {}
+        for key, spec in fields.items():
+            if key in values:
+                normalized[section][key] = values[key]
+            elif spec.required:
+                section_errors.setdefault(key, []).append("required field")
+            elif spec.default is not None:
+                normalized[section][key] = list(spec.default) if spec.kind is list else spec.default
+        if section_errors:
+            errors[section] = section_errors
     for section in config:
-        for key in config[section]:
-            env_var = f"MODBUS_PROXY_{section.upper()}_{key.upper()}"
-            if env_var in os.environ:
-                if isinstance(config[section][key], bool):
-                    config[section][key] = os.environ[env_var].lower() in ('true', '1', 'yes')
-                elif isinstance(config[section][key], int):
-                    config[section][key] = int(os.environ[env_var])
-                elif isinstance(config[section][key], float):
-                    config[section][key] = float(os.environ[env_var])
-                else:
-                    config[section][key] = os.environ[env_var]
-
-    return validator.normalized(config)
+        if section not in CONFIG_SCHEMA:
+            errors[section] = ["unknown field"]
+    if errors:
+        raise ValueError(f"Configuration validation failed: {errors}")
+
+    # Umgebungsvariablen überschreiben Konfigurationswerte, falls vorhanden
+    for env_var, value in os.environ.items():
+        if not env_var.startswith(ENV_PREFIX) or env_var not in ENV_OVERRIDES:
+            continue
+        section, key, coerce = ENV_OVERRIDES[env_var]
+        try:
+            normalized[section][key] = coerce(value)
+        except ValueError:
+            errors.setdefault(section, {}).setdefault(key, []).append(f"invalid value in {env_var}")
+
+    for section, values in normalized.items():
+        section_errors = errors.setdefault(section, {})
+        def error(key, message, section_errors=section_errors):
+            section_errors.setdefault(key, []).append(message)
+        for key, value in values.items():
+            values[key] = check_config_value(key, value, CONFIG_SCHEMA[section][key], error)
+        if not section_errors:
+            del errors[section]
+    if errors:
+        raise ValueError(f"Configuration validation failed: {errors}")
+    return normalized
+
+# Konfiguration laden und prozessweit zwischenspeichern
+@functools.lru_cache(maxsize=8)
+def load_config_cached(config_path, mtime_ns, size, env):  # pylint: disable=unused-argument
+    """Parse and validate a configuration file version, keyed by its stat data and environment"""
+    import yaml  # pylint: disable=import-outside-toplevel
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    with open(config_path, "r", encoding="utf-8") as file:
+        config = yaml.load(file, Loader=loader)
+    return validate_config(config)
 
 # Konfiguration laden
 def load_config(config_path):
     """Load configuration from YAML file with environment variable support"""
-    with open(config_path, "r", encoding="utf-8") as file:
-        config = yaml.safe_load(file)
-    return validate_config(config)
+    stat = os.stat(config_path)
+    env = tuple(sorted((key, value) for key, value in os.environ.items() if key.startswith(ENV_PREFIX)))
+    return copy.deepcopy(load_config_cached(config_path, stat.st_mtime_ns, stat.st_size, env))
+
+# Log-Formatter mit zwischengespeichertem Zeitstempel
+class CachedTimeFormatter(logging.Formatter):
+    """Formatter that only calls strftime once per wall-clock second"""
+    def __init__(self, fmt=None, datefmt=None):
+        super().__init__(fmt, datefmt)
+        self._cached = (None, "")
+
+    def formatTime(self, record, datefmt=None):
+        if datefmt:
+            return super().formatTime(record, datefmt)
+        sec = int(record.created)
+        cached_sec, cached_str = self._cached
+        if sec != cached_sec:
+            cached_str = time.strftime("%Y-%m-%d %H:%M:%S", self.converter(sec))
+            self._cached = (sec, cached_str)
+        return f"{cached_str},{int(record.msecs):03d}"
+
+# Queue-Handler, der das Formatieren dem Log-Thread überlässt
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that enqueues records unformatted.
+
+    The stock prepare() formats the message in the calling thread; here the
+    QueueListener's handlers do it. Log arguments are therefore rendered
+    later and must not be mutated after the logging call.
+    """
+    def prepare(self, record):
+        return record
+
+# Log-Thread beenden und ausstehende Einträge schreiben
+def stop_log_listener():
+    """Flush queued log records and stop the listener thread, if running"""
+    global _log_listener
+    if _log_listener is not None:
+        _log_listener.stop()
+        _log_listener = None
+
+atexit.register(stop_log_listener)
 
 # Logger initialisieren
 def init_logger(config):
-    """Initialize logger with appropriate configuration"""
+    """Initialize logger with appropriate configuration.
+
+    Request threads only enqueue records through a QueueHandler; a
+    QueueListener thread does the formatting and the file/console I/O.
+    """
+    global _log_listener
     logger = logging.getLogger()
     for handler in logger.handlers[:]:
         logger.removeHandler(handler)
+    stop_log_listener()
     logger.setLevel(config["Logging"].get("LogLevel", "INFO").upper())
-    formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+    formatter = CachedTimeFormatter('%(asctime)s - %(levelname)s - %(message)s')
 
+    handlers = []
+    file_error = None
     if config["Logging"].get("Enable", False):
         try:
             file_handler = logging.FileHandler(config["Logging"].get("LogFile", "modbus_proxy.log"))
             file_handler.setFormatter(formatter)
-            logger.addHandler(file_handler)
-        except (PermissionError, OSError) as e):
-            print(f"Warning: Could not set up file logging: {str(e)}")
+            handlers.append(file_handler)
+        except (PermissionError, OSError) as e:
+            file_error = e
 
     console_handler = logging.StreamHandler()
     console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
+    handlers.append(console_handler)
+
+    logger.addHandler(DeferredQueueHandler(queue.SimpleQueue()))
+    _log_listener = logging.handlers.QueueListener(logger.handlers[0].queue, *handlers)
+    _log_listener.start()
+    if file_error is not None:
+        logger.warning("Could not set up file logging: %s", file_error)
     return logger
 
+# Socket-Optionen setzen
+def tune_socket(sock):
+    """Apply TCP_NODELAY, small buffers and keepalive to a client or upstream socket"""
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    # ADUs sind höchstens 260 Bytes groß, große Kernelpuffer kosten nur Speicher
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SOCKET_BUFFER_SIZE)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SOCKET_BUFFER_SIZE)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+    if hasattr(socket, "TCP_KEEPIDLE"):
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, KEEPALIVE_IDLE)
+
 # Modbus-Client-Klasse
 class PersistentModbusClient:
-    """Enhanced Modbus client with better connection management"""
+    """Enhanced Modbus client with better connection management.
+
+    Not thread-safe: an instance is owned by exactly one worker thread that
+    forwards requests to it, so no locking is needed around socket I/O.
+    """
     def __init__(self, modbus_config, logger):
         self.config = modbus_config
         self.logger = logger
-        self.client = None
-        self._lock = threading.RLock()
+        self.sock = None
+        self._connected = False
+        self._debug = logger.isEnabledFor(logging.DEBUG)
+        self._transaction_id = 0
+        self._buffer = bytearray(MODBUS_MAX_ADU_LENGTH)
+        self._view = memoryview(self._buffer)
+        # Platz für eine komplette Pipeline, damit mehrere Antworten pro recv_into ankommen
+        self._batch_buffer = bytearray(MAX_PIPELINE_DEPTH * MODBUS_MAX_ADU_LENGTH)
+        self._batch_view = memoryview(self._batch_buffer)
 
     def connect(self):
-        """Connect to Modbus server with exponential backoff retry strategy"""
-        with self._lock:
-            attempts = 0
-            while not self.client or not self.client.is_socket_open():
-                try:
-                    if self.client:
-                        self.client.close()
-                    self.logger.info(f"Connecting to Modbus server at {self.config.host}:{self.config.port}")
-                    self.client = ModbusTcpClient(
-                        host=self.config.host,
-                        port=self.config.port,
-                        timeout=self.config.timeout
-                    )
-                    if self.client.connect():
-                        self.logger.info("Successfully connected to Modbus server.")
-                        time.sleep(self.config.delay)
-                        return True
-                    else:
-                        raise ConnectionError("Failed to connect to Modbus server.")
-                except (socket.error, OSError, ConnectionError) as exc:
-                    attempts += 1
-                    if attempts >= self.config.max_retries:
-                        self.logger.critical(f"Max retries ({self.config.max_retries}) reached. Giving up.")
-                        raise
-                    backoff = min(self.config.max_backoff, (2 ** attempts) + random.uniform(0, 1))
-                    self.logger.error(f"Connection error: {exc}. Attempt {attempts} of {self.config.max_retries}. "
-                                      f"Retrying in {backoff:.2f}s")
-                    time.sleep(backoff)
+        """Connect to Modbus server with full-jitter exponential backoff between retries"""
+        attempts = 0
+        while self.sock is None:
+            try:
+                self.logger.info(f"Connecting to Modbus server at {self.config.host}:{self.config.port}")
+                sock = socket.create_connection((self.config.host, self.config.port), timeout=self.config.timeout)
+                tune_socket(sock)
+                self.sock = sock
+                self.logger.info("Successfully connected to Modbus server.")
+                time.sleep(self.config.delay)
+                self._connected = True
+                return True
+            except (socket.error, OSError, ConnectionError) as exc:
+                attempts += 1
+                if attempts >= self.config.max_retries:
+                    self.logger.critical(f"Max retries ({self.config.max_retries}) reached. Giving up.")
+                    raise
+                # Full Jitter: zufällige Wartezeit bis zur exponentiellen Obergrenze verteilt Reconnects mehrerer Proxys
+                backoff = random.uniform(0, min(self.config.max_backoff, 2 ** attempts))
+                self.logger.error(f"Connection error: {exc}. Attempt {attempts} of {self.config.max_retries}. "
+                                  f"Retrying in {backoff:.2f}s")
+                time.sleep(backoff)
+        self._connected = True
+        return True
     
     @contextmanager
     def connection(self):
-        """Context manager for ensuring connection is active"""
+        """Context manager for ensuring connection is active.
+
+        Any error during an exchange discards the socket, because the position
+        in the response stream is unknown afterwards. Errors from connect()
+        itself are not retried here.
+        """
+        if not self._connected:
+            self.connect()
         try:
-            if not self.client or not self.client.is_socket_open():
-                self.connect()
-            yield self.client
+            yield self.sock
         except Exception as exc:
-            self.logger.error(f"Connection error: {exc}")
+            self.logger.error("Connection error: %s", exc)
+            self.close()
             self.connect()
             raise
     
+    def _read_exact(self, sock, offset, length):
+        """Receive exactly length bytes into the response buffer starting at offset"""
+        end = offset + length
+        while offset < end:
+            received = sock.recv_into(self._view[offset:end])
+            if not received:
+                raise ConnectionError("Modbus server closed the connection.")
+            offset += received
+
     def send_request(self, data):
         """Send request to Modbus server with improved error handling"""
-        with self._lock:
-            try:
-                with self.connection() as client:
-                    self.logger.debug(f"Sending request: {data.hex()}")
-                    client.socket.sendall(data)
-                    response = b""
-                    client.socket.settimeout(self.config.timeout)
-                    while True:
-                        try:
-                            chunk = client.socket.recv(1024)
-                            if not chunk:
-                                break
-                            response += chunk
-                            if len(chunk) < 1024:
-                                break
-                        except socket.timeout:
-                            self.logger.warning("Socket recv timeout reached.")
-                            break
-                    self.logger.debug(f"Received response: {response.hex()}")
-                    return response
-            except (socket.error, ConnectionError) as exc:
-                self.logger.error(f"Communication error during request: {exc}")
-                raise
+        try:
+            with self.connection() as sock:
+                # Heiße Pfade: Attribute und Konstanten einmal in Locals binden
+                buffer = self._buffer
+                header_length = MODBUS_TCP_HEADER_LENGTH
+                if self._debug:
+                    self.logger.debug("Sending request: %s", data.hex())
+                sock.sendall(data)
+                try:
+                    # Normalfall: Header und PDU kommen mit einem einzigen recv_into an
+                    received = sock.recv_into(buffer, MODBUS_MAX_ADU_LENGTH)
+                    if not received:
+                        raise ConnectionError("Modbus server closed the connection.")
+                    if received < header_length:
+                        self._read_exact(sock, received, header_length - received)
+                        received = header_length
+                    pdu_length = _PDU_LEN(buffer, 4)[0]
+                    if pdu_length > MODBUS_MAX_ADU_LENGTH - header_length:
+                        raise ConnectionError(f"Invalid Modbus response length: {pdu_length}")
+                    if received < header_length + pdu_length:
+                        self._read_exact(sock, received, header_length + pdu_length - received)
+                    elif received > header_length + pdu_length:
+                        raise ConnectionError("Unexpected data after Modbus response.")
+                except socket.timeout:
+                    self.logger.warning("Socket recv timeout reached.")
+                    raise
+                # Eine verspätete Antwort auf eine frühere Anfrage darf nicht zugestellt werden
+                if buffer[0:2] != data[0:2]:
+                    raise ConnectionError(f"Unexpected transaction ID in response: {buffer[0:2].hex()}")
+                response = bytes(self._view[:header_length + pdu_length])
+                if self._debug:
+                    self.logger.debug("Received response: %s", response.hex())
+                return response
+        except (socket.error, ConnectionError) as exc:
+            self._connected = False
+            self.logger.error("Communication error during request: %s", exc)
+            raise
+
+    def _next_transaction_id(self):
+        self._transaction_id = (self._transaction_id + 1) & 0xFFFF
+        return self._transaction_id
+
+    def _receive_responses(self, sock, count):
+        """Receive count pipelined response ADUs, taking as many per recv_into as have arrived"""
+        header_length = MODBUS_TCP_HEADER_LENGTH
+        buffer = self._batch_buffer
+        view = self._batch_view
+        responses = []
+        filled = position = 0
+        while len(responses) < count:
+            received = sock.recv_into(view[filled:])
+            if not received:
+                raise ConnectionError("Modbus server closed the connection.")
+            filled += received
+            # Alle vollständig empfangenen ADUs aus dem Puffer schneiden
+            while filled - position >= header_length:
+                pdu_length = _PDU_LEN(buffer, position + 4)[0]
+                if pdu_length > MODBUS_MAX_ADU_LENGTH - header_length:
+                    raise ConnectionError(f"Invalid Modbus response length: {pdu_length}")
+                end = position + header_length + pdu_length
+                if end > filled:
+                    break
+                responses.append(bytes(view[position:end]))
+                position = end
+        if len(responses) > count or position != filled:
+            raise ConnectionError("Unexpected data after pipelined Modbus responses.")
+        return responses
+
+    def send_requests(self, frames):
+        """Pipeline several request ADUs and return their responses in request order.
+
+        Transaction IDs are rewritten to unique values while in flight so that
+        identical IDs from different clients cannot be confused, then restored.
+        """
+        if len(frames) == 1:
+            return [self.send_request(frames[0])]
+        try:
+            with self.connection() as sock:
+                tagged = {}
+                for index, frame in enumerate(frames):
+                    tagged[_PACK_TRANSACTION_ID(self._next_transaction_id())] = index
+                self.logger.debug("Pipelining %d requests", len(frames))
+                sock.sendall(b"".join(tag + frame[2:] for tag, frame in zip(tagged, frames)))
+                responses = [None] * len(frames)
+                try:
+                    for response in self._receive_responses(sock, len(frames)):
+                        index = tagged.get(response[:2])
+                        if index is None or responses[index] is not None:
+                            raise ConnectionError(f"Unexpected transaction ID in response: {response[:2].hex()}")
+                        responses[index] = frames[index][:2] + response[2:]
+                except socket.timeout:
+                    self.logger.warning("Socket recv timeout reached.")
+                    raise
+                return responses
+        except (socket.error, ConnectionError) as exc:
+            self._connected = False
+            self.logger.error("Communication error during pipelined request: %s", exc)
+            raise
 
     def close(self):
         """Safely close connection"""
+        self._connected = False
+        if self.sock:
+            try:
+                self.sock.close()
+                self.logger.info("Modbus connection closed.")
+            except Exception as exc:
+                self.logger.warning(f"Error closing Modbus connection: {exc}")
+            finally:
+                self.sock = None
+
+# Zugriffskontrolle
+def build_allowed_ranges(networks, version=4):
+    """Collapse networks of one IP version into sorted, non-overlapping (starts, ends) integer lists"""
+    collapsed = collapse_addresses(net for net in networks if net.version == version)
+    ranges = [(int(net.network_address), int(net.broadcast_address)) for net in collapsed]
+    return [start for start, _ in ranges], [end for _, end in ranges]
+
+def in_ranges(ip_int, ranges):
+    """Binary-search an integer address in sorted, non-overlapping ranges"""
+    starts, ends = ranges
+    index = bisect.bisect_right(starts, ip_int) - 1
+    return index >= 0 and ip_int <= ends[index]
+
+def is_ip_allowed(address, allowed_v4, allowed_v6):
+    """Check a client address against the allowed IPv4/IPv6 ranges"""
+    try:
+        ip_int = _IPV4(socket.inet_aton(address))[0]
+    except OSError:
+        return in_ranges(int(ip_address(address)), allowed_v6)
+    return in_ranges(ip_int, allowed_v4)
+
+# Client-Verbindung beenden
+def drop_client(client_socket):
+    """Shut down a client socket; the reactor then sees EOF and closes it"""
+    try:
+        client_socket.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass
+
+# Anfrage-Warteschlange
+class RequestQueue:
+    """Bounded FIFO of pending requests built on a deque and an Event.
+
+    deque.append/popleft are atomic, so producers only pay for the Event
+    wake-up instead of the Condition round trip of queue.Queue. A full
+    queue rejects new requests instead of blocking the reactor.
+    """
+    def __init__(self, maxsize):
+        self._items = collections.deque()
+        self._ready = threading.Event()
+        self.maxsize = maxsize
+
+    def put(self, item):
+        """Append an item; returns False if the queue is full"""
+        if len(self._items) >= self.maxsize:
+            return False
+        self._items.append(item)
+        self._ready.set()
+        return True
+
+    def get_nowait(self):
+        try:
+            return self._items.popleft()
+        except IndexError:
+            raise queue.Empty from None
+
+    def get(self, timeout=None):
+        """Pop the oldest item, waiting up to timeout seconds"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            try:
+                return self._items.popleft()
+            except IndexError:
+                pass
+            self._ready.clear()
+            if self._items:
+                continue
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                raise queue.Empty
+            self._ready.wait(remaining)
+
+    def __len__(self):
+        return len(self._items)
+
+# Begrenzung gleichzeitiger Client-Verbindungen
+class ConnectionLimit:
+    """Count of open client connections, capped at MaxConnections.
+
+    A plain lock around an int: threading.Semaphore runs every non-blocking
+    acquire through a Condition.
+    """
+    def __init__(self, maximum):
+        self.maximum = maximum
+        self.active = 0
+        self._lock = threading.Lock()
+
+    def try_acquire(self):
+        """Reserve a connection slot; False if the limit is reached"""
         with self._lock:
-            if self.client:
-                try:
-                    self.client.close()
-                    self.logger.info("Modbus connection closed.")
-                except Exception as exc:
-                    self.logger.warning(f"Error closing Modbus connection: {exc}")
-                finally:
-                    self.client = None
+            if self.active >= self.maximum:
+                return False
+            self.active += 1
+            return True
+
+    def release(self):
+        with self._lock:
+            self.active -= 1
+
+# Zustand einer Client-Verbindung
+class ClientConnection:
+    """Selector data of a client socket: its id, its worker queue and any partially received ADU"""
+    __slots__ = ("connection_id", "request_queue", "pending")
+
+    def __init__(self, connection_id, request_queue):
+        self.connection_id = connection_id
+        self.request_queue = request_queue
+        self.pending = None
 
 # Client-Verbindungen behandeln
-def handle_client(client_socket, client_address, request_queue, logger, stop_event, active_connections, semaphore):
-    """Handle individual client connections with improved resource management"""
-    connection_id = f"{client_address[0]}:{client_address[1]}"
-    active_connections[connection_id] = client_socket
-    try:
-        logger.info(f"New client connected: {connection_id}")
-        client_socket.settimeout(60)
-        while not stop_event.is_set():
+class ClientReactor:
+    """Single thread serving its listener(s) and their client sockets through one selector (epoll on Linux).
+
+    Idle clients cost a selector entry instead of a blocked thread. Listeners
+    must be added before run() starts, since selectors are not thread-safe.
+    """
+    def __init__(self, request_queues, logger, stop_event, connection_limit, allowed_v4, allowed_v6):
+        self.request_queues = request_queues
+        self.logger = logger
+        self.stop_event = stop_event
+        self.connection_limit = connection_limit
+        self.allowed_v4 = allowed_v4
+        self.allowed_v6 = allowed_v6
+        self._check_allowed = bool(allowed_v4[0] or allowed_v6[0])
+        self._selector = selectors.DefaultSelector()
+        self._wakeup_recv, self._wakeup_send = socket.socketpair()
+        self._wakeup_recv.setblocking(False)
+        self._wakeup_send.setblocking(False)
+        self._selector.register(self._wakeup_recv, selectors.EVENT_READ)
+        self._buffer = bytearray(DEFAULT_RECV_BUFFER_SIZE)
+        self._view = memoryview(self._buffer)
+        # Listener, die wegen erschöpfter Dateideskriptoren kurz pausieren
+        self._paused_listeners = []
+        self._resume_at = 0.0
+
+    def add_listener(self, server_socket):
+        """Register a non-blocking listening socket; its data marker is None"""
+        self._selector.register(server_socket, selectors.EVENT_READ)
+
+    def wakeup(self):
+        """Interrupt a pending select(), e.g. so run() notices the stop event"""
+        try:
+            self._wakeup_send.send(b"\0")
+        except OSError:
+            pass
+
+    def _accept_clients(self, server_socket):
+        """Accept every pending connection of a listener until it would block"""
+        while True:
             try:
-                data = client_socket.recv(1024)
-                if not data:
-                    logger.info(f"Client disconnected: {connection_id}")
-                    break
-                request_queue.put((data, client_socket, connection_id))
-            except socket.timeout:
-                if stop_event.is_set():
-                    break
+                client_socket, client_address = server_socket.accept()
+            except BlockingIOError:
+                return
+            except OSError as exc:
+                self.logger.error("Error accepting connection: %s", exc)
+                if exc.errno in (errno.EMFILE, errno.ENFILE, errno.ENOBUFS, errno.ENOMEM):
+                    # Die Verbindung bleibt im Backlog; ohne Pause meldet epoll sie sofort erneut
+                    self._selector.unregister(server_socket)
+                    self._paused_listeners.append(server_socket)
+                    self._resume_at = time.monotonic() + ACCEPT_BACKOFF
+                return
+            # Prüfe erlaubte IPs mit CIDR-Unterstützung
+            if self._check_allowed and not is_ip_allowed(client_address[0], self.allowed_v4, self.allowed_v6):
+                self.logger.warning("Connection from %s not allowed", client_address[0])
+                client_socket.close()
                 continue
-            except (socket.error, OSError) as exc:
-                logger.error(f"Error with client {connection_id}: {exc}")
-                break
-    finally:
+            # Prüfe maximale Verbindungen
+            if not self.connection_limit.try_acquire():
+                self.logger.warning("Maximum connections reached, connection rejected")
+                client_socket.close()
+                continue
+            connection_id = f"{client_address[0]}:{client_address[1]}"
+            # Alle Anfragen eines Clients gehen an denselben Worker, damit ihre Reihenfolge erhalten bleibt
+            connection = ClientConnection(connection_id, self.request_queues[hash(connection_id) % len(self.request_queues)])
+            # Lesen nur bei Bereitschaft; das Timeout begrenzt sendall des Workers bei hängenden Clients
+            client_socket.settimeout(CLIENT_SEND_TIMEOUT)
+            tune_socket(client_socket)
+            self._selector.register(client_socket, selectors.EVENT_READ, connection)
+            self.logger.info("New client connected: %s", connection_id)
+
+    def _resume_listeners(self):
+        """Re-register listeners paused by _accept_clients once the back-off has passed"""
+        for server_socket in self._paused_listeners:
+            self._selector.register(server_socket, selectors.EVENT_READ)
+        self._paused_listeners.clear()
+
+    def _close_client(self, client_socket, connection):
+        self._selector.unregister(client_socket)
         try:
             client_socket.close()
         except Exception:
             pass
-        if connection_id in active_connections:
-            del active_connections[connection_id]
-        semaphore.release()
-        logger.info(f"Socket for {connection_id} closed")
+        self.connection_limit.release()
+        self.logger.info("Socket for %s closed", connection.connection_id)
+
+    def _read_client(self, client_socket, connection):
+        connection_id = connection.connection_id
+        try:
+            received = client_socket.recv_into(self._buffer)
+        except (BlockingIOError, socket.timeout):
+            return
+        except OSError as exc:
+            self.logger.error("Error with client %s: %s", connection_id, exc)
+            self._close_client(client_socket, connection)
+            return
+        if not received:
+            self.logger.info("Client disconnected: %s", connection_id)
+            self._close_client(client_socket, connection)
+            return
+        if connection.pending:
+            connection.pending += self._view[:received]
+            data = connection.pending
+        else:
+            data = self._view[:received]
+        # Anhand des MBAP-Längenfelds in einzelne ADUs zerlegen; Reste warten auf das nächste recv
+        header_length = MODBUS_TCP_HEADER_LENGTH
+        available = len(data)
+        position = 0
+        while available - position >= header_length:
+            pdu_length = _PDU_LEN(data, position + 4)[0]
+            if not 2 <= pdu_length <= MODBUS_MAX_ADU_LENGTH - header_length:
+                self.logger.warning("Invalid Modbus frame length %s from %s, closing connection",
+                                    pdu_length, connection_id)
+                self._close_client(client_socket, connection)
+                return
+            end = position + header_length + pdu_length
+            if end > available:
+                break
+            if not connection.request_queue.put((bytes(data[position:end]), client_socket, connection_id)):
+                self.logger.warning("Request queue full, dropping request from %s", connection_id)
+            position = end
+        connection.pending = bytearray(data[position:]) if position < available else None
+
+    def run(self, cpu=None):
+        """Dispatch ready sockets until the stop event is set, optionally pinned to one CPU"""
+        if cpu is not None:
+            try:
+                os.sched_setaffinity(0, {cpu})
+            except OSError as exc:
+                self.logger.warning("Could not pin reactor to CPU %s: %s", cpu, exc)
+        wakeup_recv = self._wakeup_recv
+        select = self._selector.select
+        read_client = self._read_client
+        is_stopped = self.stop_event.is_set
+        try:
+            while not is_stopped():
+                timeout = 1
+                if self._paused_listeners:
+                    timeout = self._resume_at - time.monotonic()
+                    if timeout <= 0:
+                        self._resume_listeners()
+                        timeout = 1
+                for key, _ in select(timeout=timeout):
+                    if key.data is not None:
+                        read_client(key.fileobj, key.data)
+                    elif key.fileobj is wakeup_recv:
+                        try:
+                            wakeup_recv.recv(DEFAULT_RECV_BUFFER_SIZE)
+                        except OSError:
+                            pass
+                    else:
+                        self._accept_clients(key.fileobj)
+        except Exception:
+            # Der Executor verwirft die Future; ohne Reactor nimmt der Proxy keine Anfragen mehr an
+            self.logger.exception("Client reactor failed, shutting down")
+            self.stop_event.set()
+
+    def close(self):
+        """Close listeners, client sockets and the wake-up pair once run() has returned"""
+        for key in list(self._selector.get_map().values()):
+            if key.data is not None:
+                self._close_client(key.fileobj, key.data)
+            else:
+                key.fileobj.close()
+        for server_socket in self._paused_listeners:
+            server_socket.close()
+        self._paused_listeners.clear()
+        self._selector.close()
+        self._wakeup_send.close()
+
+# Lesezugriffe auf Register erkennen
+def parse_read_request(data):
+    """Return (transaction_id, unit_id, function_code, start, count) for a plain register read, else None"""
+    if len(data) != _READ_REQUEST.size:
+        return None
+    transaction_id, protocol_id, length, unit_id, function_code, start, count = _READ_REQUEST.unpack(data)
+    if protocol_id != 0 or length != 6 or function_code not in MODBUS_READ_REGISTER_FUNCTIONS:
+        return None
+    if not 1 <= count <= MODBUS_MAX_READ_REGISTERS:
+        return None
+    return transaction_id, unit_id, function_code, start, count
+
+# Warteschlange für ein kurzes Zeitfenster leeren
+def drain_queue(request_queue, window, limit=MAX_COALESCE_BATCH - 1):
+    """Collect further queued requests until the window expires (0 = only those already queued)"""
+    items = []
+    deadline = time.monotonic() + window
+    while len(items) < limit:
+        remaining = deadline - time.monotonic()
+        try:
+            if remaining <= 0:
+                items.append(request_queue.get_nowait())
+            else:
+                items.append(request_queue.get(timeout=remaining))
+        except queue.Empty:
+            break
+    return items
+
+# Benachbarte Lesezugriffe zusammenfassen
+def coalesce_requests(batch):
+    """Group adjacent register reads of the same unit and function code.
+
+    Returns a list of groups in send order. Each group sits at the position
+    of its first request and keeps arrival order inside, and a read only
+    joins a group that is sent no earlier than its client's previous request,
+    so responses to one client are never reordered. Reads are not merged
+    across other requests, so a write is never overtaken by a read queued
+    after it. A group with a single entry is forwarded unchanged.
+    """
+    groups = []
+    # Offene Gruppen je (Unit, Funktionscode): [Index in groups, erstes Register, Ende]
+    spans = {}
+    # Index der Gruppe mit der letzten Anfrage je Client
+    latest = {}
+    for item in batch:
+        connection_id = item[2]
+        read = parse_read_request(item[0])
+        if read is None:
+            spans.clear()
+            latest[connection_id] = len(groups)
+            groups.append([item])
+            continue
+        _, unit_id, function_code, start, count = read
+        end = start + count
+        earliest = latest.get(connection_id, -1)
+        candidates = spans.setdefault((unit_id, function_code), [])
+        for span in candidates:
+            index, first, last = span
+            if index >= earliest and start <= last and end >= first \
+                    and max(last, end) - min(first, start) <= MODBUS_MAX_READ_REGISTERS:
+                groups[index].append(item)
+                span[1], span[2] = min(first, start), max(last, end)
+                break
+        else:
+            index = len(groups)
+            candidates.append([index, start, end])
+            groups.append([item])
+        latest[connection_id] = index
+    return groups
+
+# Zusammengefasste Antwort auf die einzelnen Anfragen aufteilen
+def split_coalesced_response(reads, response):
+    """Build one response per request from the response to the merged read, or None if it does not fit"""
+    transaction_id, unit_id, function_code = reads[0][:3]
+    first = min(read[3] for read in reads)
+    last = max(read[3] + read[4] for read in reads)
+    byte_count = (last - first) * 2
+    if len(response) != MODBUS_TCP_HEADER_LENGTH + 3 + byte_count:
+        return None
+    if _READ_RESPONSE_HEADER.unpack_from(response) != (transaction_id, 0, 3 + byte_count, unit_id, function_code, byte_count):
+        return None
+    pack_header = _READ_RESPONSE_HEADER.pack
+    registers = response[_READ_RESPONSE_HEADER.size:]
+    responses = []
+    for read in reads:
+        offset = (read[3] - first) * 2
+        payload = registers[offset:offset + read[4] * 2]
+        header = pack_header(read[0], 0, 3 + len(payload), unit_id, function_code, len(payload))
+        responses.append(header + payload)
+    return responses
+
+# Antwort an den Client senden
+def send_response(client_socket, connection_id, response, logger):
+    """Send a response back to the client if it is still connected"""
+    try:
+        client_socket.sendall(response)
+    except OSError as exc:
+        logger.warning("Client %s disconnected before sending response: %s", connection_id, exc)
+        drop_client(client_socket)
+
+# Upstream-Anfrage für eine Gruppe bauen
+def build_upstream_request(group, logger):
+    """Return (frame, reads) for a group; reads is None unless the group is a coalesced read"""
+    if len(group) == 1:
+        return group[0][0], None
+    reads = [parse_read_request(data) for data, _, _ in group]
+    transaction_id, unit_id, function_code = reads[0][:3]
+    first = min(read[3] for read in reads)
+    count = max(read[3] + read[4] for read in reads) - first
+    logger.debug("Coalesced %d reads into %d+%d for unit %d", len(group), first, count, unit_id)
+    return _READ_REQUEST.pack(transaction_id, 0, 6, unit_id, function_code, first, count), reads
+
+# Antwort(en) einer Gruppe zustellen
+def deliver_group(group, reads, response, persistent_client, logger):
+    """Deliver the upstream response to the client(s) of a group"""
+    if reads is None:
+        _, client_socket, connection_id = group[0]
+        send_response(client_socket, connection_id, response, logger)
+        return
+    responses = split_coalesced_response(reads, response)
+    if responses is None:
+        logger.debug("Coalesced read rejected by server, forwarding requests individually")
+        responses = [persistent_client.send_request(data) for data, _, _ in group]
+    for (_, client_socket, connection_id), client_response in zip(group, responses):
+        send_response(client_socket, connection_id, client_response, logger)
+
+# Gruppen für Pipelining bündeln
+def pipeline_chunks(groups, depth):
+    """Split groups into chunks that can be pipelined together upstream"""
+    chunk = []
+    for group in groups:
+        chunk.append(group)
+        if len(chunk) >= depth:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+# Client-Verbindung prüfen
+def is_client_alive(item, logger):
+    """Check whether the client of a queued request is still connected"""
+    _, client_socket, connection_id = item
+    if client_socket.fileno() == -1:
+        logger.warning("Client %s disconnected before processing request", connection_id)
+        return False
+    return True
 
 # Anfragen verarbeiten
-def process_requests(request_queue, persistent_client, logger, stop_event, active_connections):
+def process_requests(request_queue, persistent_client, logger, stop_event):
     """Process requests from the queue with improved error handling"""
-    while not stop_event.is_set():
+    coalesce_window = persistent_client.config.coalesce_window
+    pipeline_depth = persistent_client.config.pipeline_depth
+    batching = coalesce_window > 0 or pipeline_depth > 1
+    # Heiße Schleife: Methoden einmal in Locals binden
+    get_request = request_queue.get
+    is_stopped = stop_event.is_set
+    send_request = persistent_client.send_request
+    while not is_stopped():
         try:
-            data, client_socket, connection_id = request_queue.get(timeout=1)
-            if connection_id not in active_connections or client_socket.fileno() == -1:
-                logger.warning(f"Client {connection_id} disconnected before processing request")
+            item = get_request(timeout=1)
+            if not batching:
+                # Ohne Bündelung geht jede Anfrage direkt an den Server
+                if not is_client_alive(item, logger):
+                    continue
+                data, client_socket, connection_id = item
+                try:
+                    response = send_request(data)
+                except (socket.error, ConnectionError) as exc:
+                    logger.error("Error processing request from %s: %s", connection_id, exc)
+                    drop_client(client_socket)
+                    continue
+                send_response(client_socket, connection_id, response, logger)
                 continue
-            try:
-                response = persistent_client.send_request(data)
-                if connection_id in active_connections and client_socket.fileno() != -1:
-                    client_socket.sendall(response)
-                else:
-                    logger.warning(f"Client {connection_id} disconnected before sending response")
-            except (socket.error, ConnectionError) as exc:
-                logger.error(f"Error processing request from {connection_id}: {exc}")
+            batch = [item]
+            if coalesce_window > 0:
+                batch.extend(drain_queue(request_queue, coalesce_window))
+            elif pipeline_depth > 1:
+                batch.extend(drain_queue(request_queue, 0, pipeline_depth - 1))
+            batch = [item for item in batch if is_client_alive(item, logger)]
+            groups = coalesce_requests(batch) if coalesce_window > 0 else [[item] for item in batch]
+            for chunk in pipeline_chunks(groups, pipeline_depth):
                 try:
-                    if client_socket.fileno() != -1:
-                        client_socket.close()
-                except Exception:
-                    pass
-                if connection_id in active_connections:
-                    del active_connections[connection_id]
+                    upstream = [build_upstream_request(group, logger) for group in chunk]
+                    responses = persistent_client.send_requests([frame for frame, _ in upstream])
+                    for group, (_, reads), response in zip(chunk, upstream, responses):
+                        deliver_group(group, reads, response, persistent_client, logger)
+                except (socket.error, ConnectionError) as exc:
+                    for group in chunk:
+                        for _, client_socket, connection_id in group:
+                            logger.error("Error processing request from %s: %s", connection_id, exc)
+                            drop_client(client_socket)
         except queue.Empty:
             continue
         except Exception as exc:
-            logger.error(f"Unexpected error in request processor: {exc}")
+            logger.error("Unexpected error in request processor: %s", exc)
+
+# Lauschenden Socket erstellen
+def create_listener(host, port, reuse_port, backlog, incoming_cpu=None):
+    """Create a listening socket, optionally sharing the port via SO_REUSEPORT"""
+    server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    try:
+        server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if reuse_port:
+            server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        # Der Kernel bevorzugt bei SO_REUSEPORT den Listener, dessen CPU die Verbindung empfangen hat
+        if incoming_cpu is not None and hasattr(socket, "SO_INCOMING_CPU"):
+            server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_INCOMING_CPU, incoming_cpu)
+        server_socket.bind((host, port))
+        server_socket.listen(backlog)
+        server_socket.setblocking(False)
+    except OSError:
+        server_socket.close()
+        raise
+    return server_socket
 
 # Server starten
 def start_server(config):
@@ -333,12 +1007,18 @@ def start_server(config):
     logger.info("Starting Modbus TCP Proxy Server")
     
     stop_event = threading.Event()
-    active_connections = {}
     cpu_count = os.cpu_count() or 4
-    max_queue_size = max(10, min(1000, cpu_count * 25))
-    request_queue = queue.Queue(maxsize=max_queue_size)
-    max_workers = max(4, cpu_count * 2)
-    connection_semaphore = threading.Semaphore(config["Proxy"]["MaxConnections"])
+    # Platz für mindestens zwei ausstehende Anfragen pro Client, da volle Queues Anfragen verwerfen
+    max_queue_size = max(10, min(1000, cpu_count * 25), config["Proxy"]["MaxConnections"] * 2)
+    connection_limit = ConnectionLimit(config["Proxy"]["MaxConnections"])
+
+    # Mehrere Listener teilen sich den Port über SO_REUSEPORT (0 = einer pro CPU, fest an diese gebunden)
+    per_cpu = config["Proxy"].get("Listeners", 1) == 0
+    cpus = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else []
+    listener_count = config["Proxy"].get("Listeners", 1) or len(cpus) or cpu_count
+    if listener_count > 1 and not hasattr(socket, "SO_REUSEPORT"):
+        logger.warning("SO_REUSEPORT is not supported on this platform, using a single listener")
+        listener_count = 1
     
     # Unterstützung für CIDR-Notation in AllowedIPs
     allowed_networks = []
@@ -348,6 +1028,8 @@ def start_server(config):
                 allowed_networks.append(ip_network(ip))
             except ValueError:
                 logger.warning(f"Ungültige IP oder Netzwerk in AllowedIPs: {ip}")
+    allowed_v4 = build_allowed_ranges(allowed_networks)
+    allowed_v6 = build_allowed_ranges(allowed_networks, version=6)
     
     modbus_config = ModbusConfig(
         host=config["ModbusServer"]["ModbusServerHost"],
@@ -355,47 +1037,55 @@ def start_server(config):
         timeout=config["ModbusServer"].get("ConnectionTimeout", 10),
         delay=config["ModbusServer"].get("DelayAfterConnection", 0.5),
         max_retries=config["ModbusServer"].get("MaxRetries", 5),
-        max_backoff=config["ModbusServer"].get("MaxBackoff", 30.0)
+        max_backoff=config["ModbusServer"].get("MaxBackoff", 30.0),
+        coalesce_window=config["ModbusServer"].get("CoalesceWindow", 0.0),
+        pipeline_depth=config["ModbusServer"].get("PipelineDepth", 1)
     )
     
-    persistent_client = PersistentModbusClient(modbus_config, logger)
+    # Jeder Worker besitzt seine eigene persistente Upstream-Verbindung
+    upstream_connections = config["ModbusServer"].get("UpstreamConnections", 1)
+    persistent_clients = [PersistentModbusClient(modbus_config, logger) for _ in range(upstream_connections)]
+    request_queues = [RequestQueue(max_queue_size) for _ in range(upstream_connections)]
+    # Jeder Listener bekommt einen eigenen Reactor-Thread
+    reactors = [ClientReactor(request_queues, logger, stop_event, connection_limit, allowed_v4, allowed_v6)
+                for _ in range(listener_count)]
     
     try:
-        persistent_client.connect()
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            executor.submit(process_requests, request_queue, persistent_client, logger, stop_event, active_connections)
-            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as server_socket:
-                server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-                server_socket.bind((config["Proxy"]["ServerHost"], config["Proxy"]["ServerPort"]))
-                server_socket.listen(5)
-                server_socket.settimeout(1)
-                logger.info(f"Proxy server listening on {config['Proxy']['ServerHost']}:{config['Proxy']['ServerPort']}")
-                
-                def shutdown_handler(signum, frame):
-                    logger.info(f"Received shutdown signal {signum}. Shutting down gracefully...")
-                    stop_event.set()
-                
-                signal.signal(signal.SIGINT, shutdown_handler)
-                signal.signal(signal.SIGTERM, shutdown_handler)
-                
+        for persistent_client in persistent_clients:
+            persistent_client.connect()
+        backlog = min(config["Proxy"]["MaxConnections"], socket.SOMAXCONN)
+        reactor_cpus = [cpus[index % len(cpus)] if per_cpu and cpus else None for index in range(listener_count)]
+        for reactor, cpu in zip(reactors, reactor_cpus):
+            reactor.add_listener(create_listener(config["Proxy"]["ServerHost"], config["Proxy"]["ServerPort"],
+                                                 listener_count > 1, backlog, cpu))
+        logger.info(f"Proxy server listening on {config['Proxy']['ServerHost']}:{config['Proxy']['ServerPort']} "
+                    f"({listener_count} listener(s))")
+
+        def shutdown_handler(signum, frame):
+            logger.info(f"Received shutdown signal {signum}. Shutting down gracefully...")
+            stop_event.set()
+
+        signal.signal(signal.SIGINT, shutdown_handler)
+        signal.signal(signal.SIGTERM, shutdown_handler)
+
+        # Ein Reactor pro Listener plus ein Worker pro Upstream-Verbindung
+        with ThreadPoolExecutor(max_workers=upstream_connections + listener_count) as executor:
+            for request_queue, persistent_client in zip(request_queues, persistent_clients):
+                executor.submit(process_requests, request_queue, persistent_client, logger, stop_event)
+            for reactor, cpu in zip(reactors, reactor_cpus):
+                executor.submit(reactor.run, cpu)
+            try:
                 while not stop_event.is_set():
-                    try:
-                        client_socket, client_address = server_socket.accept()
-                        # Prüfe erlaubte IPs mit CIDR-Unterstützung
-                        if allowed_networks and not any(ip_address(client_address[0]) in net for net in allowed_networks):
-                            logger.warning(f"Connection from {client_address[0]} not allowed")
-                            client_socket.close()
-                            continue
-                        # Prüfe maximale Verbindungen
-                        if not connection_semaphore.acquire(blocking=False):
-                            logger.warning("Maximum connections reached, connection rejected")
-                            client_socket.close()
-                            continue
-                        executor.submit(handle_client, client_socket, client_address, request_queue, logger, stop_event, active_connections, connection_semaphore)
-                    except socket.timeout:
-                        continue
+                    stop_event.wait(1)
+            finally:
+                stop_event.set()
+                for reactor in reactors:
+                    reactor.wakeup()
     finally:
-        persistent_client.close()
+        for reactor in reactors:
+            reactor.close()
+        for persistent_client in persistent_clients:
+            persistent_client.close()
 
 # Hauptprogramm
 if __name__ == "__main__":
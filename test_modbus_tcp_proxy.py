@@ -0,0 +1,534 @@
+"""Tests for modbus_tcp_proxy; run with `python -m pytest -n auto`"""
+import copy
+import dataclasses
+import errno
+import logging
+import os
+import queue
+import socket
+import struct
+import sys
+import threading
+import time
+from ipaddress import ip_network
+from unittest import mock
+
+import pytest
+
+import modbus_tcp_proxy as proxy
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+LOGGER = logging.getLogger("modbus_tcp_proxy.test")
+LOGGER.addHandler(logging.NullHandler())
+LOGGER.propagate = False
+
+# Hilfsfunktionen für Modbus-Rahmen
+def read_request(transaction_id, start, count, unit_id=1, function_code=3):
+    return struct.pack(">HHHBBHH", transaction_id, 0, 6, unit_id, function_code, start, count)
+
+def read_response(transaction_id, start, count, unit_id=1, function_code=3):
+    payload = b"".join(struct.pack(">H", address) for address in range(start, start + count))
+    return struct.pack(">HHHBBB", transaction_id, 0, 3 + len(payload), unit_id, function_code, len(payload)) + payload
+
+def transaction_ids(groups):
+    """Transaction IDs in the order the groups answer them"""
+    return [struct.unpack_from(">H", data)[0] for group in groups for data, _, _ in group]
+
+# Socket, das empfangene Daten in festen Stücken liefert
+class ChunkedSocket:
+    def __init__(self, *chunks):
+        self.chunks = list(chunks)
+
+    def recv_into(self, view):
+        chunk = self.chunks.pop(0) if self.chunks else b""
+        view[:len(chunk)] = chunk
+        return len(chunk)
+
+# Listener, der vor dem echten accept() vorgegebene Ergebnisse liefert
+class FakeListener:
+    def __init__(self, sock, *results):
+        self.sock = sock
+        self.results = list(results)
+
+    def fileno(self):
+        return self.sock.fileno()
+
+    def accept(self):
+        if not self.results:
+            return self.sock.accept()
+        result = self.results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def close(self):
+        self.sock.close()
+
+# Upstream-Client über ein Socket-Paar
+@pytest.fixture
+def upstream(modbus_config):
+    """PersistentModbusClient wired to one end of a socket pair; returns (client, server end)"""
+    client = proxy.PersistentModbusClient(modbus_config, LOGGER)
+    client.sock, server = socket.socketpair()
+    client.sock.settimeout(1)
+    client._connected = True
+    client.connect = mock.Mock()
+    yield client, server
+    if client.sock is not None:
+        client.sock.close()
+    server.close()
+
+def serve(server, reply):
+    """Answer the next request(s) on the server end with reply(received bytes)"""
+    def handle():
+        data = server.recv(4096)
+        server.sendall(reply(data))
+    thread = threading.Thread(target=handle)
+    thread.start()
+    return thread
+
+def test_send_request_returns_response(upstream):
+    client, server = upstream
+    thread = serve(server, lambda data: read_response(struct.unpack_from(">H", data)[0], 10, 2))
+    response = client.send_request(read_request(7, 10, 2))
+    thread.join()
+    assert response == read_response(7, 10, 2)
+
+def test_send_request_tid_mismatch_closes_socket(upstream):
+    client, server = upstream
+    sock = client.sock
+    thread = serve(server, lambda data: read_response(6, 10, 2))
+    with pytest.raises(ConnectionError, match="Unexpected transaction ID"):
+        client.send_request(read_request(7, 10, 2))
+    thread.join()
+    assert client.sock is None
+    assert sock.fileno() == -1
+    client.connect.assert_called_once()
+
+def test_send_request_timeout_after_send_closes_socket(upstream):
+    client, _ = upstream
+    client.sock.settimeout(0.05)
+    with pytest.raises(socket.timeout):
+        client.send_request(read_request(7, 10, 2))
+    assert client.sock is None
+
+def test_send_requests_rewrites_and_restores_tids(upstream):
+    client, server = upstream
+    sent = []
+    def reply(data):
+        # Antworten in umgekehrter Reihenfolge, damit die Zuordnung über die TID erfolgen muss
+        frames = [data[offset:offset + 12] for offset in range(0, len(data), 12)]
+        sent.extend(frames)
+        return b"".join(read_response(struct.unpack_from(">H", frame)[0], *struct.unpack_from(">HH", frame, 8))
+                        for frame in reversed(frames))
+    thread = serve(server, reply)
+    frames = [read_request(1, 0, 2), read_request(1, 5, 1), read_request(9, 20, 3)]
+    responses = client.send_requests(frames)
+    thread.join()
+    assert len({frame[:2] for frame in sent}) == len(frames)
+    assert responses == [read_response(1, 0, 2), read_response(1, 5, 1), read_response(9, 20, 3)]
+
+def test_send_requests_unknown_tid_is_rejected(upstream):
+    client, server = upstream
+    thread = serve(server, lambda data: read_response(0xFFFF, 0, 1) + read_response(0xFFFE, 0, 1))
+    with pytest.raises(ConnectionError, match="Unexpected transaction ID"):
+        client.send_requests([read_request(1, 0, 1), read_request(2, 0, 1)])
+    thread.join()
+    assert client.sock is None
+
+def test_receive_responses_split_across_reads(upstream):
+    client, _ = upstream
+    data = read_response(1, 0, 2) + read_response(2, 4, 1)
+    sock = ChunkedSocket(data[:4], data[4:17], data[17:])
+    assert client._receive_responses(sock, 2) == [read_response(1, 0, 2), read_response(2, 4, 1)]
+
+def test_receive_responses_rejects_extra_data(upstream):
+    client, _ = upstream
+    sock = ChunkedSocket(read_response(1, 0, 2) + read_response(2, 4, 1))
+    with pytest.raises(ConnectionError, match="Unexpected data"):
+        client._receive_responses(sock, 1)
+
+def failing_connections(monkeypatch, failures):
+    """Let socket.create_connection fail `failures` times before connecting to a local listener"""
+    server = socket.create_server(("127.0.0.1", 0))
+    create_connection = socket.create_connection
+    def connect(address, timeout=None):
+        if len(attempts) < failures:
+            attempts.append(address)
+            raise ConnectionRefusedError(errno.ECONNREFUSED, "Connection refused")
+        return create_connection(server.getsockname(), timeout=timeout)
+    attempts = []
+    monkeypatch.setattr(proxy.socket, "create_connection", connect)
+    return server
+
+def test_connect_retries_then_succeeds(monkeypatch, sleeps, modbus_config):
+    config = dataclasses.replace(modbus_config, delay=0.5, max_retries=3, max_backoff=1.0)
+    client = proxy.PersistentModbusClient(config, LOGGER)
+    with failing_connections(monkeypatch, 2):
+        assert client.connect()
+        client.close()
+    assert len(sleeps) == 3
+    assert all(0 <= delay <= 1.0 for delay in sleeps[:2])
+    assert sleeps[2] == 0.5
+
+def test_connect_gives_up_after_max_retries(monkeypatch, sleeps, modbus_config):
+    config = dataclasses.replace(modbus_config, delay=0.5, max_retries=3)
+    client = proxy.PersistentModbusClient(config, LOGGER)
+    with failing_connections(monkeypatch, 3), pytest.raises(ConnectionRefusedError):
+        client.connect()
+    assert len(sleeps) == 2
+    assert client.sock is None
+
+def test_connect_full_jitter_bounds(monkeypatch, sleeps, modbus_config):
+    config = dataclasses.replace(modbus_config, max_retries=6, max_backoff=10.0)
+    client = proxy.PersistentModbusClient(config, LOGGER)
+    # Obere Grenze jedes Zufallsintervalls liefern, damit die Deckelung sichtbar wird
+    monkeypatch.setattr(proxy.random, "uniform", lambda low, high: high)
+    with failing_connections(monkeypatch, config.max_retries), pytest.raises(ConnectionRefusedError):
+        client.connect()
+    assert sleeps == [min(config.max_backoff, 2 ** attempt) for attempt in range(1, config.max_retries)]
+    monkeypatch.setattr(proxy.random, "uniform", lambda low, high: low)
+    sleeps.clear()
+    with failing_connections(monkeypatch, config.max_retries), pytest.raises(ConnectionRefusedError):
+        client.connect()
+    assert sleeps == [0] * (config.max_retries - 1)
+
+# Client-Reactor mit einem lokalen Listener
+class ReactorHarness:
+    def __init__(self):
+        self.stop_event = threading.Event()
+        self.request_queues = [proxy.RequestQueue(100) for _ in range(4)]
+        self.connection_limit = proxy.ConnectionLimit(10)
+        self.reactor = proxy.ClientReactor(self.request_queues, LOGGER, self.stop_event,
+                                           self.connection_limit, ([], []), ([], []))
+        self.server = socket.create_server(("127.0.0.1", 0))
+        self.server.setblocking(False)
+        self.peers = []
+
+    def connect(self):
+        """Let the reactor accept a client and return its socket, selector data and peer end"""
+        peer = socket.create_connection(self.server.getsockname())
+        self.peers.append(peer)
+        self.reactor._accept_clients(self.server)
+        connection_id = "%s:%s" % peer.getsockname()
+        for key in self.reactor._selector.get_map().values():
+            if key.data is not None and key.data.connection_id == connection_id:
+                return key.fileobj, key.data, peer
+        raise AssertionError(f"{connection_id} was not accepted")
+
+    def close(self):
+        self.reactor.close()
+        self.server.close()
+        for peer in self.peers:
+            peer.close()
+
+@pytest.fixture
+def harness():
+    harness = ReactorHarness()
+    yield harness
+    harness.close()
+
+def test_requests_of_one_client_go_to_one_queue(harness):
+    for _ in range(8):
+        client_socket, connection, peer = harness.connect()
+        for transaction_id in range(3):
+            peer.sendall(read_request(transaction_id, 0, 1))
+            harness.reactor._read_client(client_socket, connection)
+    owners = {}
+    for index, request_queue in enumerate(harness.request_queues):
+        while len(request_queue):
+            data, _, connection_id = request_queue.get_nowait()
+            owners.setdefault(connection_id, []).append((index, struct.unpack_from(">H", data)[0]))
+    assert len(owners) == 8
+    for entries in owners.values():
+        assert len({index for index, _ in entries}) == 1
+        assert [transaction_id for _, transaction_id in entries] == [0, 1, 2]
+
+def test_split_and_merged_frames_are_reframed(harness):
+    client_socket, connection, peer = harness.connect()
+    first, second, third = read_request(1, 0, 2), read_request(2, 4, 1), read_request(3, 8, 1)
+    for part in (first[:3], first[3:8], first[8:] + second + third[:7], third[7:]):
+        peer.sendall(part)
+        harness.reactor._read_client(client_socket, connection)
+    queued = [connection.request_queue.get_nowait()[0] for _ in range(len(connection.request_queue))]
+    assert queued == [first, second, third]
+    assert connection.pending is None
+
+@pytest.mark.parametrize("pdu_length", [0, 1, proxy.MODBUS_MAX_ADU_LENGTH])
+def test_invalid_length_closes_client(harness, pdu_length):
+    client_socket, connection, peer = harness.connect()
+    peer.sendall(struct.pack(">HHHB", 1, 0, pdu_length, 1))
+    harness.reactor._read_client(client_socket, connection)
+    assert client_socket.fileno() == -1
+    assert len(connection.request_queue) == 0
+
+def test_closed_client_frees_its_connection_slot(harness):
+    client_socket, connection, peer = harness.connect()
+    assert harness.connection_limit.active == 1
+    peer.close()
+    harness.reactor._read_client(client_socket, connection)
+    assert client_socket.fileno() == -1
+    assert harness.connection_limit.active == 0
+
+def test_connection_limit_rejects_when_full():
+    limit = proxy.ConnectionLimit(2)
+    assert limit.try_acquire() and limit.try_acquire()
+    assert not limit.try_acquire()
+    limit.release()
+    assert limit.try_acquire()
+    assert limit.active == 2
+
+def test_accept_backs_off_when_descriptors_run_out(harness):
+    reactor, stop_event = harness.reactor, harness.stop_event
+    server = socket.create_server(("127.0.0.1", 0))
+    server.setblocking(False)
+    listener = FakeListener(server, OSError(errno.EMFILE, "Too many open files"))
+    reactor.add_listener(listener)
+    reactor._accept_clients(listener)
+    assert reactor._paused_listeners == [listener]
+    harness.peers.append(socket.create_connection(server.getsockname()))
+    thread = threading.Thread(target=reactor.run)
+    thread.start()
+    try:
+        # Wake-up-Socket, Listener und der angenommene Client
+        deadline = time.monotonic() + 2
+        while len(reactor._selector.get_map()) < 3 and time.monotonic() < deadline:
+            stop_event.wait(0.01)
+    finally:
+        stop_event.set()
+        reactor.wakeup()
+        thread.join()
+    assert reactor._paused_listeners == []
+    assert len(reactor._selector.get_map()) == 3
+
+def test_crash_stops_the_proxy(harness, monkeypatch):
+    monkeypatch.setattr(harness.reactor._selector, "select", mock.Mock(side_effect=RuntimeError("boom")))
+    harness.reactor.run()
+    assert harness.stop_event.is_set()
+
+# Bündeln von Registerlesezugriffen
+def item(data, connection_id="client"):
+    return (data, None, connection_id)
+
+def test_adjacent_reads_are_merged():
+    batch = [item(read_request(1, 0, 2)), item(read_request(2, 2, 3)), item(read_request(3, 1, 1))]
+    groups = proxy.coalesce_requests(batch)
+    assert len(groups) == 1
+    assert transaction_ids(groups) == [1, 2, 3]
+
+def test_other_units_gaps_and_writes_are_not_merged():
+    write = struct.pack(">HHHBBHH", 4, 0, 6, 1, 6, 3, 99)
+    batch = [item(read_request(1, 0, 2)), item(read_request(2, 0, 2, unit_id=2)),
+             item(read_request(3, 10, 2)), item(write), item(read_request(5, 2, 2))]
+    groups = proxy.coalesce_requests(batch)
+    assert [len(group) for group in groups] == [1, 1, 1, 1, 1]
+    assert transaction_ids(groups) == [1, 2, 3, 4, 5]
+
+def test_merge_is_capped_at_max_registers():
+    batch = [item(read_request(1, 0, 100)), item(read_request(2, 100, 100))]
+    assert len(proxy.coalesce_requests(batch)) == 2
+
+def test_one_client_keeps_transaction_order():
+    # Sortiert nach Startregister käme 5 vor 1 und 4 vor 2
+    batch = [item(read_request(1, 10, 3)), item(read_request(2, 50, 3)),
+             item(read_request(3, 0, 3, unit_id=2)), item(read_request(4, 12, 3)),
+             item(read_request(5, 0, 3))]
+    assert transaction_ids(proxy.coalesce_requests(batch)) == [1, 2, 3, 4, 5]
+
+def test_reads_of_other_clients_are_merged_in_order():
+    batch = [item(read_request(1, 0, 2), "a"), item(read_request(2, 50, 2), "b"),
+             item(read_request(3, 2, 2), "c"), item(read_request(4, 52, 2), "a")]
+    groups = proxy.coalesce_requests(batch)
+    assert [transaction_ids([group]) for group in groups] == [[1, 3], [2, 4]]
+
+def test_split_coalesced_response():
+    reads = [proxy.parse_read_request(read_request(11, 0, 2)), proxy.parse_read_request(read_request(12, 1, 3))]
+    responses = proxy.split_coalesced_response(reads, read_response(11, 0, 4))
+    assert responses == [read_response(11, 0, 2), read_response(12, 1, 3)]
+
+def test_split_rejects_exception_response():
+    reads = [proxy.parse_read_request(read_request(11, 0, 2)), proxy.parse_read_request(read_request(12, 2, 2))]
+    exception = struct.pack(">HHHBBB", 11, 0, 3, 1, 0x83, 2)
+    assert proxy.split_coalesced_response(reads, exception) is None
+
+# Zugriffskontrolle über AllowedIPs
+def allowed_ranges(*networks):
+    networks = [ip_network(network) for network in networks]
+    return proxy.build_allowed_ranges(networks), proxy.build_allowed_ranges(networks, version=6)
+
+# Gemischte Freigabeliste für die Einzelfälle von is_ip_allowed
+ALLOWED_NETWORKS = ("192.168.1.0/24", "10.0.0.5/32", "fd00::/8", "2001:db8::/32", "2001:db8:1::/48")
+
+# Die Bereiche sind unveränderliche Eingaben und werden einmal pro Sitzung gebaut
+@pytest.fixture(scope="session")
+def allowed():
+    return allowed_ranges(*ALLOWED_NETWORKS)
+
+@pytest.mark.parametrize("address, expected", [
+    ("192.168.1.77", True),
+    ("192.168.1.0", True),
+    ("192.168.1.255", True),
+    ("192.168.2.1", False),
+    ("10.0.0.5", True),
+    ("10.0.0.6", False),
+    ("fd12::1", True),
+    ("2001:db8:ffff::1", True),
+    ("fe80::1", False),
+])
+def test_is_ip_allowed(allowed, address, expected):
+    assert proxy.is_ip_allowed(address, *allowed) == expected
+
+def test_ipv6_networks_are_collapsed(allowed):
+    _, allowed_v6 = allowed
+    assert len(allowed_v6[0]) == 2
+
+def test_overlapping_networks_are_collapsed():
+    starts, ends = proxy.build_allowed_ranges([ip_network("10.0.0.0/8"), ip_network("10.1.0.0/16"),
+                                               ip_network("10.255.255.255/32"), ip_network("11.0.0.0/8")])
+    assert (starts, ends) == ([0x0A000000], [0x0BFFFFFF])
+    allowed_v4, allowed_v6 = allowed_ranges("10.1.0.0/16", "10.0.0.0/8", "172.16.0.0/12")
+    assert proxy.is_ip_allowed("10.200.0.1", allowed_v4, allowed_v6)
+    assert proxy.is_ip_allowed("172.31.255.255", allowed_v4, allowed_v6)
+    assert not proxy.is_ip_allowed("172.32.0.0", allowed_v4, allowed_v6)
+    assert not proxy.is_ip_allowed("9.255.255.255", allowed_v4, allowed_v6)
+
+@pytest.mark.parametrize("ip_int, expected", [(9, False), (10, True), (15, True), (16, False), (20, True), (21, False)])
+def test_in_ranges_bounds(ip_int, expected):
+    assert proxy.in_ranges(ip_int, ([10, 20], [15, 20])) == expected
+
+def test_in_ranges_empty():
+    assert not proxy.in_ranges(10, ([], []))
+
+# Hostnamen in der Konfiguration
+def host_errors(value):
+    errors = []
+    proxy.validate_network_settings("ServerHost", value, lambda field, message: errors.append(message))
+    return errors
+
+@pytest.mark.parametrize("value", ["example.com", "modbus-gw.local.", "192.168.1.10", "::1"])
+def test_valid_hosts(value):
+    assert host_errors(value) == []
+
+@pytest.mark.parametrize("value", ["example.com\n", "-bad.example", "bad..example", "under_score", "a" * 64 + ".example"])
+def test_invalid_hosts(value):
+    assert host_errors(value) == ["Invalid hostname or IP address"]
+
+# Konfigurationsprüfung
+def test_defaults_are_filled_in(base_config):
+    config = proxy.validate_config(base_config)
+    assert config["Proxy"]["AllowedIPs"] == []
+    assert config["Proxy"]["MaxConnections"] == 100
+    assert config["ModbusServer"]["ConnectionTimeout"] == 10
+    assert config["Logging"]["LogLevel"] == "INFO"
+
+def test_int_is_accepted_for_float(base_config):
+    base_config["ModbusServer"]["DelayAfterConnection"] = 1
+    assert isinstance(proxy.validate_config(base_config)["ModbusServer"]["DelayAfterConnection"], float)
+
+@pytest.mark.parametrize("section, key, value, pattern", [
+    ("Proxy", "ServerPort", 70000, r"'ServerPort': \['max value is 65535'\]"),
+    ("Proxy", "ServerPort", True, r"'ServerPort': \['must be of int type'\]"),
+    ("Proxy", "AllowedIPs", "x", r"'AllowedIPs': \['must be of list type'\]"),
+    ("ModbusServer", "ModbusServerHost", "bad host!", r"'ModbusServerHost': \['Invalid hostname"),
+    ("Logging", "LogLevel", "LOUD", r"'LogLevel': \['unallowed value LOUD'\]"),
+    ("Proxy", "Unknown", 1, r"'Unknown': \['unknown field'\]"),
+])
+def test_invalid_values_are_rejected(base_config, section, key, value, pattern):
+    base_config.setdefault(section, {})[key] = value
+    with pytest.raises(ValueError, match=pattern):
+        proxy.validate_config(base_config)
+
+@pytest.mark.parametrize("section, key, pattern", [
+    ("Proxy", "ServerHost", r"'ServerHost': \['required field'\]"),
+    ("Proxy", "ServerPort", r"'ServerPort': \['required field'\]"),
+    (None, "ModbusServer", r"'ModbusServer': \['required field'\]"),
+])
+def test_missing_values_are_rejected(base_config, section, key, pattern):
+    del (base_config[section] if section else base_config)[key]
+    with pytest.raises(ValueError, match=pattern):
+        proxy.validate_config(base_config)
+
+def test_environment_override_is_validated(monkeypatch, base_config):
+    monkeypatch.setenv("MODBUS_PROXY_PROXY_SERVERPORT", "1502")
+    assert proxy.validate_config(copy.deepcopy(base_config))["Proxy"]["ServerPort"] == 1502
+    monkeypatch.setenv("MODBUS_PROXY_PROXY_SERVERPORT", "70000")
+    with pytest.raises(ValueError, match=r"'ServerPort': \['max value is 65535'\]"):
+        proxy.validate_config(base_config)
+
+# Logging über die Queue
+def test_records_are_queued_unformatted():
+    records = queue.SimpleQueue()
+    record = logging.LogRecord("proxy", logging.INFO, __file__, 1, "Client %s connected", ("1.2.3.4:502",), None)
+    proxy.DeferredQueueHandler(records).handle(record)
+    queued = records.get_nowait()
+    assert queued is record
+    assert (queued.msg, queued.args) == ("Client %s connected", ("1.2.3.4:502",))
+
+# Laden der Konfigurationsdatei
+needs_yaml = pytest.mark.skipif(yaml is None, reason="PyYAML is not installed")
+
+@pytest.fixture
+def config_path(tmp_path):
+    proxy.load_config_cached.cache_clear()
+    return tmp_path / "config.yaml"
+
+def write_config(path, config, mtime_ns):
+    with open(path, "w", encoding="utf-8") as file:
+        yaml.safe_dump(config, file)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+@needs_yaml
+def test_changed_file_is_validated_again(config_path, base_config):
+    write_config(config_path, base_config, 1_000_000_000)
+    assert proxy.load_config(str(config_path))["Proxy"]["ServerPort"] == 5020
+    base_config["Proxy"]["ServerPort"] = 70000
+    write_config(config_path, base_config, 2_000_000_000)
+    with pytest.raises(ValueError):
+        proxy.load_config(str(config_path))
+
+@needs_yaml
+def test_callers_get_a_copy(config_path, base_config):
+    write_config(config_path, base_config, 1_000_000_000)
+    with mock.patch.object(proxy, "validate_config", wraps=proxy.validate_config) as validate:
+        proxy.load_config(str(config_path))["Proxy"]["ServerPort"] = 1
+        assert proxy.load_config(str(config_path))["Proxy"]["ServerPort"] == 5020
+    validate.assert_called_once()
+
+@needs_yaml
+def test_nothing_is_written_next_to_the_config(config_path, base_config):
+    write_config(config_path, base_config, 1_000_000_000)
+    proxy.load_config(str(config_path))
+    assert [path.name for path in config_path.parent.iterdir()] == ["config.yaml"]
+
+@pytest.fixture
+def yaml_loads(monkeypatch):
+    """Arguments of every yaml.load call made while loading the config"""
+    calls = []
+    load = yaml.load
+    def record(stream, Loader):
+        calls.append((stream, Loader))
+        return load(stream, Loader=Loader)
+    monkeypatch.setattr(yaml, "load", record)
+    return calls
+
+@needs_yaml
+def test_config_is_parsed_with_the_c_loader(config_path, base_config, yaml_loads):
+    write_config(config_path, base_config, 1_000_000_000)
+    proxy.load_config(str(config_path))
+    expected = yaml.CSafeLoader if yaml.__with_libyaml__ else yaml.SafeLoader
+    assert [loader for _, loader in yaml_loads] == [expected]
+
+@needs_yaml
+def test_config_is_parsed_from_the_file_handle(config_path, base_config, yaml_loads):
+    write_config(config_path, base_config, 1_000_000_000)
+    proxy.load_config(str(config_path))
+    (stream, _), = yaml_loads
+    assert not isinstance(stream, (str, bytes))
+    assert stream.name == str(config_path)
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__]))